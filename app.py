@@ -1,16 +1,19 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import time
 import logging
+import hashlib
+from html import escape
 
 # Import custom modules
 from earnings_scraper import EarningsScraper
 from news_scraper import NewsScraper
-from utils import format_date, export_to_csv, setup_logging
+from utils import format_date, export_to_csv_bytes, setup_logging
 
 # Configure logging
 setup_logging()
@@ -57,22 +60,47 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
+# Date-derived columns added once at load time; dropped again for display/export
+DERIVED_COLUMNS = ['date_only', 'day_of_week']
+
+@st.cache_resource
+def get_earnings_scraper():
+    """Single scraper per process so its HTTP connection pool stays warm"""
+    return EarningsScraper()
+
+@st.cache_resource(ttl=3600)  # Cache for 1 hour, shared without copying
 def load_earnings_data():
-    """Load earnings data with caching"""
+    """Load earnings data with caching
+
+    Returns the DataFrame plus the sorted tickers and their upper-cased forms
+    for search filtering, built once per load. The DataFrame is shared across
+    reruns and sessions, so it must not be mutated in place.
+    """
     try:
-        scraper = EarningsScraper()
-        return scraper.get_earnings_calendar()
+        df = get_earnings_scraper().get_earnings_calendar()
+        tickers = []
+        if not df.empty:
+            df['ticker'] = df['ticker'].astype('category')
+            df['date_only'] = df['date'].dt.date
+            df['day_of_week'] = df['date'].dt.day_name()
+            # Categories are the sorted unique tickers
+            tickers = df['ticker'].cat.categories.tolist()
+        return df, (tickers, [t.upper() for t in tickers])
     except Exception as e:
         logger.error(f"Error loading earnings data: {e}")
-        return pd.DataFrame()
+        return pd.DataFrame(), ([], [])
+
+@st.cache_data(max_entries=32)
+def build_csv_bytes(df_key, _df):
+    """CSV bytes for a filtered frame, cached under its content hash"""
+    return export_to_csv_bytes(_df)
 
 @st.cache_data(ttl=1800)  # Cache for 30 minutes
 def load_news_data(tickers):
     """Load news data for given tickers"""
     try:
-        news_scraper = NewsScraper()
-        return news_scraper.get_news_for_tickers(tickers)
+        with NewsScraper() as news_scraper:
+            return news_scraper.get_news_for_tickers(tickers)
     except Exception as e:
         logger.error(f"Error loading news data: {e}")
         return pd.DataFrame()
@@ -87,7 +115,7 @@ def main():
     
     # Load data
     with st.spinner("Loading earnings data..."):
-        earnings_df = load_earnings_data()
+        earnings_df, (available_tickers, upper_tickers) = load_earnings_data()
     
     if earnings_df.empty:
         st.error("Unable to load earnings data. Please check your connection and try again.")
@@ -105,9 +133,6 @@ def main():
         max_value=today + timedelta(days=90)
     )
     
-    # Ticker filter
-    available_tickers = sorted(earnings_df['ticker'].unique())
-    
     # Primary ticker selection
     ticker_selection_mode = st.sidebar.radio(
         "Ticker Selection Mode",
@@ -128,7 +153,8 @@ def main():
         
         # Filter tickers based on search
         if ticker_search:
-            filtered_tickers = [t for t in available_tickers if ticker_search.upper() in t.upper()]
+            query = ticker_search.upper()
+            filtered_tickers = [t for t, upper in zip(available_tickers, upper_tickers) if query in upper]
             if not filtered_tickers:
                 st.sidebar.warning(f"No tickers found matching '{ticker_search}'")
                 filtered_tickers = available_tickers
@@ -152,7 +178,8 @@ def main():
         
         # Filter tickers based on search
         if multi_ticker_search:
-            filtered_multi_tickers = [t for t in available_tickers if multi_ticker_search.upper() in t.upper()]
+            query = multi_ticker_search.upper()
+            filtered_multi_tickers = [t for t, upper in zip(available_tickers, upper_tickers) if query in upper]
             if not filtered_multi_tickers:
                 st.sidebar.warning(f"No tickers found matching '{multi_ticker_search}'")
                 filtered_multi_tickers = available_tickers
@@ -170,7 +197,8 @@ def main():
         popular_tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA', 'NFLX', 'DIS', 'PYPL']
         
         # Filter to only include popular tickers that are available
-        available_popular = [t for t in popular_tickers if t in available_tickers]
+        available_set = set(available_tickers)
+        available_popular = [t for t in popular_tickers if t in available_set]
         
         if available_popular:
             selected_tickers = st.sidebar.multiselect(
@@ -191,22 +219,21 @@ def main():
     # Company name filter
     company_search = st.sidebar.text_input("Search Company Name")
     
-    # Filter earnings data
-    filtered_df = earnings_df.copy()
+    # Filter earnings data with one combined mask and a single selection
+    earnings_dates = earnings_df['date_only']
+    mask = np.ones(len(earnings_df), dtype=bool)
     
     if len(date_range) == 2:
-        filtered_df = filtered_df[
-            (filtered_df['date'].dt.date >= date_range[0]) & 
-            (filtered_df['date'].dt.date <= date_range[1])
-        ]
+        mask &= ((earnings_dates >= date_range[0]) & (earnings_dates <= date_range[1])).values
     
     if selected_tickers:
-        filtered_df = filtered_df[filtered_df['ticker'].isin(selected_tickers)]
+        mask &= earnings_df['ticker'].isin(set(selected_tickers)).values
     
     if company_search:
-        filtered_df = filtered_df[
-            filtered_df['company'].str.contains(company_search, case=False, na=False)
-        ]
+        mask &= earnings_df['company'].str.contains(company_search, case=False, na=False).values
+    
+    filtered_df = earnings_df.loc[mask]
+    filtered_dates = earnings_dates[mask]
     
     # Show current selection info
     if ticker_selection_mode == "All Tickers":
@@ -237,13 +264,13 @@ def main():
     
     with col2:
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        today_count = len(filtered_df[filtered_df['date'].dt.date == today])
+        today_count = int((filtered_dates == today).sum())
         st.metric("Today's Earnings", today_count)
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col3:
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        week_count = len(filtered_df[filtered_df['date'].dt.date <= today + timedelta(days=7)])
+        week_count = int((filtered_dates <= today + timedelta(days=7)).sum())
         st.metric("This Week", week_count)
         st.markdown('</div>', unsafe_allow_html=True)
     
@@ -259,19 +286,24 @@ def main():
     with tab1:
         st.subheader("Earnings Calendar")
         
-        # Calendar visualization
+        # Calendar visualization: one WebGL trace colored per ticker instead
+        # of one SVG trace per ticker
         if not filtered_df.empty:
-            fig = px.timeline(
-                filtered_df, 
-                x_start="date", 
-                x_end="date",
-                y="ticker",
+            palette = np.array(px.colors.qualitative.Plotly)
+            ticker_codes = filtered_df['ticker'].cat.codes.values
+            fig = go.Figure(go.Scattergl(
+                x=filtered_df['date'],
+                y=filtered_df['ticker'],
+                mode='markers',
+                marker=dict(color=palette[ticker_codes % len(palette)], size=10),
+                customdata=filtered_df[['company', 'time']].values,
+                hovertemplate="<b>%{y}</b> - %{x|%Y-%m-%d}<br>%{customdata[0]}<br>%{customdata[1]}<extra></extra>"
+            ))
+            fig.update_layout(
                 title="Upcoming Earnings Timeline",
-                color="ticker",
-                hover_data=["company", "time"],
-                height=600
+                height=600,
+                showlegend=False
             )
-            fig.update_layout(showlegend=False)
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("No earnings data available for selected filters.")
@@ -281,7 +313,7 @@ def main():
         
         if not filtered_df.empty:
             # Display table
-            display_df = filtered_df.copy()
+            display_df = filtered_df.drop(columns=DERIVED_COLUMNS)
             display_df['date'] = display_df['date'].dt.strftime('%Y-%m-%d')
             display_df = display_df.rename(columns={
                 'company': 'Company',
@@ -297,14 +329,14 @@ def main():
             )
             
             # Export functionality
-            if st.button("📥 Export to CSV"):
-                csv_data = export_to_csv(filtered_df)
-                st.download_button(
-                    label="Download CSV",
-                    data=csv_data,
-                    file_name=f"earnings_calendar_{datetime.now().strftime('%Y%m%d')}.csv",
-                    mime="text/csv"
-                )
+            export_df = filtered_df.drop(columns=DERIVED_COLUMNS)
+            export_key = hashlib.md5(pd.util.hash_pandas_object(export_df, index=False).values).digest()
+            st.download_button(
+                label="📥 Download CSV",
+                data=build_csv_bytes(export_key, export_df),
+                file_name=f"earnings_calendar_{datetime.now().strftime('%Y%m%d')}.csv",
+                mime="text/csv"
+            )
         else:
             st.info("No earnings data available for selected filters.")
     
@@ -316,14 +348,16 @@ def main():
                 news_df = load_news_data(selected_tickers[:5])  # Limit to 5 tickers for performance
             
             if not news_df.empty:
-                for _, article in news_df.iterrows():
-                    st.markdown(f'<div class="news-card">', unsafe_allow_html=True)
-                    st.markdown(f"**{article['title']}**")
-                    st.markdown(f"*{article['ticker']} - {article['date']}*")
-                    st.markdown(f"{article['summary']}")
-                    if article['url']:
-                        st.markdown(f"[Read more]({article['url']})")
-                    st.markdown('</div>', unsafe_allow_html=True)
+                # Render every card in one markdown call instead of one per line
+                cards = []
+                for article in news_df.itertuples(index=False):
+                    read_more = f'<br><a href="{escape(article.url)}">Read more</a>' if article.url else ''
+                    cards.append(
+                        f'<div class="news-card"><b>{escape(str(article.title))}</b><br>'
+                        f'<i>{escape(str(article.ticker))} - {article.date}</i><br>'
+                        f'{escape(str(article.summary))}{read_more}</div>'
+                    )
+                st.markdown(''.join(cards), unsafe_allow_html=True)
             else:
                 st.info("No news articles found for selected tickers.")
         else:
@@ -334,7 +368,6 @@ def main():
         
         if not filtered_df.empty:
             # Earnings by day of week
-            filtered_df['day_of_week'] = filtered_df['date'].dt.day_name()
             day_counts = filtered_df['day_of_week'].value_counts()
             
             fig1 = px.bar(
@@ -346,13 +379,17 @@ def main():
             st.plotly_chart(fig1, use_container_width=True)
             
             # Earnings by date
-            date_counts = filtered_df.groupby(filtered_df['date'].dt.date).size()
+            date_counts = filtered_df.groupby('date_only').size()
             
-            fig2 = px.line(
+            fig2 = go.Figure(go.Scattergl(
                 x=date_counts.index,
                 y=date_counts.values,
+                mode='lines+markers'
+            ))
+            fig2.update_layout(
                 title="Earnings Count by Date",
-                labels={'x': 'Date', 'y': 'Count'}
+                xaxis_title="Date",
+                yaxis_title="Count"
             )
             st.plotly_chart(fig2, use_container_width=True)
         else:
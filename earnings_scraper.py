@@ -1,18 +1,43 @@
-import requests
+from requests.adapters import HTTPAdapter
+from requests_cache import CachedSession
 from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import logging
-import time
 import re
 import json
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import List, Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 class EarningsScraper:
+    EARNINGS_COLUMNS = ('ticker', 'company', 'date', 'time', 'source')
+    # Headers identifying the calendar table on Yahoo and MarketWatch pages
+    EARNINGS_TABLE_HEADERS = frozenset({'Symbol', 'Company'})
+    
+    # Finviz date headers look like "Monday, February 5th"
+    _ORDINAL_RE = re.compile(r'(\d+)(?:st|nd|rd|th)\b')
+    _FINVIZ_FORMATS = ('%A, %B %d', '%B %d', '%m/%d/%Y', '%Y-%m-%d')
+    
+    # Compiled once and reused for every row of the Finviz calendar
+    _FINVIZ_CALENDAR_ROWS = etree.XPath("(//table[contains(concat(' ', normalize-space(@class), ' '), ' calendar ')])[1]//tr")
+    _FINVIZ_FALLBACK_ROWS = etree.XPath("(//table[@bgcolor='#d3d3d3'])[1]//tr")
+    _ROW_CELLS = etree.XPath('.//td')
+    _CELL_FIRST_LINK = etree.XPath('(.//a)[1]')
+    
     def __init__(self):
-        self.session = requests.Session()
+        # Calendars change at most daily, so serve repeat fetches within the
+        # hour from disk and fall back to the stale copy if a source errors
+        self.session = CachedSession(
+            '.cache/earnings',
+            backend='sqlite',
+            expire_after=3600,
+            allowable_methods=('GET',),
+            stale_if_error=True
+        )
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -21,174 +46,185 @@ class EarningsScraper:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1'
         })
+        # One keep-alive connection per source host, fetched in parallel
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
         
     def get_earnings_calendar(self, days_ahead: int = 30) -> pd.DataFrame:
         """
         Scrape earnings calendar data from multiple sources
         """
-        all_earnings = []
+        frames = []
         
         # Try multiple sources for better data coverage
         sources = [
-            self._scrape_finviz_earnings,
-            self._scrape_investing_earnings,
-            self._scrape_yahoo_finance_api,
-            self._scrape_marketwatch_earnings
+            ("https://finviz.com/calendar.ashx", self._parse_finviz_earnings),
+            ("https://www.investing.com/earnings-calendar/", self._parse_investing_earnings),
+            (self._yahoo_earnings_url(days_ahead), self._parse_yahoo_finance_earnings),
+            ("https://www.marketwatch.com/tools/earnings-calendar", self._parse_marketwatch_earnings)
         ]
         
-        for source_func in sources:
+        # Every source lives on its own host, so fetch all pages concurrently
+        # and only start parsing once they are in
+        with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+            pages = list(pool.map(self._fetch_html, [url for url, _ in sources]))
+        
+        for (url, parse_func), html in zip(sources, pages):
+            if html is None:
+                continue
             try:
-                earnings = source_func(days_ahead)
-                if earnings:
-                    all_earnings.extend(earnings)
-                    logger.info(f"Successfully scraped {len(earnings)} earnings from {source_func.__name__}")
-                time.sleep(1)  # Rate limiting
+                earnings = parse_func(html, days_ahead)
+                if earnings['ticker']:
+                    frames.append(pd.DataFrame(earnings))
+                    logger.info(f"Successfully scraped {len(earnings['ticker'])} earnings from {parse_func.__name__}")
             except Exception as e:
-                logger.error(f"Error scraping from {source_func.__name__}: {e}")
+                logger.error(f"Error scraping from {parse_func.__name__}: {e}")
                 continue
         
-        if not all_earnings:
+        if not frames:
             logger.error("No earnings data scraped from any source")
             return pd.DataFrame()
         
-        # Convert to DataFrame and remove duplicates
-        df = pd.DataFrame(all_earnings)
-        df = df.drop_duplicates(subset=['ticker', 'date'], keep='first')
+        # Stack the per-source columns and convert the whole date column in
+        # one vectorized call, dropping anything that could not be parsed
+        df = pd.concat(frames, ignore_index=True)
+        df['date'] = pd.to_datetime(df['date'], errors='coerce', cache=True)
+        df = df.dropna(subset=['date'])
         
-        # Sort by date
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.sort_values('date').reset_index(drop=True)
+        # A stable sort keeps source order within a date, so deduplicating
+        # afterwards still prefers the earlier source
+        df = df.sort_values('date', kind='stable', ignore_index=True)
+        df = df.drop_duplicates(subset=['ticker', 'date'], keep='first', ignore_index=True)
         
         return df
     
-    def _scrape_finviz_earnings(self, days_ahead: int) -> List[Dict]:
+    def _empty_earnings(self) -> Dict[str, List]:
+        """
+        Create empty column lists for one source's earnings
+        """
+        return {column: [] for column in self.EARNINGS_COLUMNS}
+    
+    def _add_earning(self, earnings: Dict[str, List], ticker: str, company: str, date, time_str: str, source: str):
+        """
+        Append a single earnings entry to the column lists
+        """
+        earnings['ticker'].append(ticker)
+        earnings['company'].append(company)
+        earnings['date'].append(date)
+        earnings['time'].append(time_str)
+        earnings['source'].append(source)
+    
+    def _fetch_html(self, url: str) -> Optional[bytes]:
         """
-        Scrape earnings from Finviz earnings calendar
+        Fetch raw page content, returning None if the request fails
         """
-        earnings = []
+        try:
+            response = self.session.get(url, timeout=15)
+            response.raise_for_status()
+            return response.content
+        except Exception as e:
+            logger.error(f"Error fetching {url}: {e}")
+            return None
+    
+    def _yahoo_earnings_url(self, days_ahead: int) -> str:
+        """
+        Build the Yahoo Finance earnings calendar URL for the requested window
+        """
+        today = datetime.now()
+        end_date = today + timedelta(days=days_ahead)
+        return f"https://finance.yahoo.com/calendar/earnings?from={today.strftime('%Y-%m-%d')}&to={end_date.strftime('%Y-%m-%d')}&day={today.strftime('%Y-%m-%d')}"
+    
+    def _parse_finviz_earnings(self, html: bytes, days_ahead: int) -> Dict[str, List]:
+        """
+        Parse earnings from the Finviz earnings calendar page
+        """
+        earnings = self._empty_earnings()
+        today = datetime.now().date()
         
         try:
-            url = "https://finviz.com/calendar.ashx"
-            
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            tree = lxml_html.fromstring(html)
             
             # Find the earnings calendar table
-            calendar_table = soup.find('table', {'class': 'calendar'})
-            if not calendar_table:
-                calendar_table = soup.find('table', {'bgcolor': '#d3d3d3'})
+            rows = self._FINVIZ_CALENDAR_ROWS(tree)
+            if not rows:
+                rows = self._FINVIZ_FALLBACK_ROWS(tree)
             
-            if calendar_table:
-                rows = calendar_table.find_all('tr')
+            if rows:
                 current_date = None
                 
                 for row in rows:
-                    cells = row.find_all('td')
+                    cells = self._ROW_CELLS(row)
                     
                     # Check if this is a date header row
                     if len(cells) == 1 and cells[0].get('colspan'):
-                        date_text = cells[0].get_text(strip=True)
-                        current_date = self._parse_finviz_date(date_text)
+                        date_text = cells[0].text_content().strip()
+                        current_date = self._parse_finviz_date(date_text, today)
                         continue
                     
                     # Process earnings row
                     if len(cells) >= 3 and current_date:
                         try:
-                            ticker_elem = cells[1].find('a')
+                            ticker_elem = self._CELL_FIRST_LINK(cells[1])
                             if ticker_elem:
-                                ticker = ticker_elem.get_text(strip=True)
-                                company = cells[2].get_text(strip=True)
-                                time_str = cells[0].get_text(strip=True)
+                                ticker = ticker_elem[0].text_content().strip()
+                                company = cells[2].text_content().strip()
+                                time_str = cells[0].text_content().strip()
                                 
-                                if ticker and (current_date - datetime.now().date()).days <= days_ahead:
-                                    earnings.append({
-                                        'ticker': ticker,
-                                        'company': company,
-                                        'date': current_date,
-                                        'time': time_str,
-                                        'source': 'Finviz'
-                                    })
+                                if ticker and (current_date - today).days <= days_ahead:
+                                    self._add_earning(earnings, ticker, company, current_date, time_str, 'Finviz')
                         except Exception as e:
                             logger.warning(f"Error parsing Finviz row: {e}")
                             continue
             
         except Exception as e:
-            logger.error(f"Error scraping Finviz earnings: {e}")
+            logger.error(f"Error parsing Finviz earnings: {e}")
         
         return earnings
     
-    def _scrape_yahoo_finance_api(self, days_ahead: int) -> List[Dict]:
+    def _parse_yahoo_finance_earnings(self, html: bytes, days_ahead: int) -> Dict[str, List]:
         """
-        Scrape earnings using Yahoo Finance API approach
+        Parse earnings from the Yahoo Finance earnings calendar page
         """
-        earnings = []
+        earnings = self._empty_earnings()
+        today = datetime.now().date()
         
         try:
-            # Yahoo Finance calendar endpoint
-            today = datetime.now()
-            end_date = today + timedelta(days=days_ahead)
-            
-            # Format dates for API
-            start_timestamp = int(today.timestamp())
-            end_timestamp = int(end_date.timestamp())
-            
-            url = f"https://finance.yahoo.com/calendar/earnings?from={today.strftime('%Y-%m-%d')}&to={end_date.strftime('%Y-%m-%d')}&day={today.strftime('%Y-%m-%d')}"
-            
-            response = self.session.get(url, timeout=15)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Look for earnings data in script tags or table
-            tables = soup.find_all('table')
-            
-            for table in tables:
-                rows = table.find_all('tr')[1:]  # Skip header
-                
-                for row in rows:
-                    cells = row.find_all('td')
-                    if len(cells) >= 4:
-                        try:
-                            # Extract ticker from link
-                            ticker_link = cells[0].find('a')
-                            if ticker_link:
-                                ticker = ticker_link.get_text(strip=True)
-                                company = cells[1].get_text(strip=True)
-                                
-                                # Extract earnings time
-                                time_str = "N/A"
-                                if len(cells) > 2:
-                                    time_str = cells[2].get_text(strip=True)
-                                
-                                # Use current date for now, improve date parsing later
-                                earnings_date = today.date()
-                                
-                                if ticker and (earnings_date - datetime.now().date()).days <= days_ahead:
-                                    earnings.append({
-                                        'ticker': ticker,
-                                        'company': company,
-                                        'date': earnings_date,
-                                        'time': time_str,
-                                        'source': 'Yahoo Finance'
-                                    })
-                        except Exception as e:
-                            logger.warning(f"Error parsing Yahoo Finance row: {e}")
+            table = self._find_earnings_table(html)
+            if table is not None:
+                for row in table.itertuples(index=False):
+                    try:
+                        cells = self._row_cells(row)
+                        if len(cells) < 4 or self._is_header_row(cells, table):
                             continue
+                        
+                        # Only rows whose first cell links to a quote are earnings
+                        ticker, ticker_href = cells[0]
+                        if ticker_href:
+                            company, _ = cells[1]
+                            time_str, _ = cells[2]
+                            
+                            # Use current date for now, improve date parsing later
+                            earnings_date = today
+                            
+                            if ticker and (earnings_date - today).days <= days_ahead:
+                                self._add_earning(earnings, ticker, company, earnings_date, time_str, 'Yahoo Finance')
+                    except Exception as e:
+                        logger.warning(f"Error parsing Yahoo Finance row: {e}")
+                        continue
             
         except Exception as e:
-            logger.error(f"Error scraping Yahoo Finance earnings: {e}")
+            logger.error(f"Error parsing Yahoo Finance earnings: {e}")
         
         return earnings
     
-    def _scrape_investing_earnings(self, days_ahead: int) -> List[Dict]:
+    def _parse_investing_earnings(self, html: bytes, days_ahead: int) -> Dict[str, List]:
         """
-        Scrape earnings from Investing.com earnings calendar
+        Parse earnings from the Investing.com earnings calendar page
         """
-        earnings = []
+        earnings = self._empty_earnings()
+        today = datetime.now().date()
         
         try:
-            url = "https://www.investing.com/earnings-calendar/"
-            
-            response = self.session.get(url, timeout=15)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(html, 'lxml')
             
             # Find the earnings calendar table
             calendar_table = soup.find('table', {'id': 'earningsCalendarData'})
@@ -196,10 +232,8 @@ class EarningsScraper:
                 calendar_table = soup.find('table', {'class': 'genTbl'})
             
             if calendar_table:
-                rows = calendar_table.find_all('tr')[1:]  # Skip header
-                
-                for row in rows:
-                    cells = row.find_all('td')
+                for row in calendar_table.select('tr')[1:]:  # Skip header
+                    cells = row.find_all('td', recursive=False)
                     if len(cells) >= 4:
                         try:
                             # Extract company and ticker
@@ -222,80 +256,106 @@ class EarningsScraper:
                                     time_str = cells[2].get_text(strip=True) if len(cells) > 2 else 'N/A'
                                     
                                     # For now, use today's date - this should be improved
-                                    earnings_date = datetime.now().date()
+                                    earnings_date = today
                                     
                                     if ticker and company:
-                                        earnings.append({
-                                            'ticker': ticker,
-                                            'company': company,
-                                            'date': earnings_date,
-                                            'time': time_str,
-                                            'source': 'Investing.com'
-                                        })
+                                        self._add_earning(earnings, ticker, company, earnings_date, time_str, 'Investing.com')
                         except Exception as e:
                             logger.warning(f"Error parsing Investing.com row: {e}")
                             continue
             
         except Exception as e:
-            logger.error(f"Error scraping Investing.com earnings: {e}")
+            logger.error(f"Error parsing Investing.com earnings: {e}")
         
         return earnings
     
-    def _scrape_marketwatch_earnings(self, days_ahead: int) -> List[Dict]:
+    def _parse_marketwatch_earnings(self, html: bytes, days_ahead: int) -> Dict[str, List]:
         """
-        Scrape earnings from MarketWatch earnings calendar
+        Parse earnings from the MarketWatch earnings calendar page
         """
-        earnings = []
+        earnings = self._empty_earnings()
+        today = datetime.now().date()
         
         try:
-            # MarketWatch earnings calendar
-            url = "https://www.marketwatch.com/tools/earnings-calendar"
-            
-            response = self.session.get(url, timeout=15)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Look for earnings table or list
-            tables = soup.find_all('table')
-            
-            for table in tables:
-                rows = table.find_all('tr')[1:]  # Skip header
-                
-                for row in rows:
-                    cells = row.find_all('td')
-                    if len(cells) >= 3:
-                        try:
-                            # Extract ticker and company
-                            ticker_cell = cells[0] if cells else None
-                            company_cell = cells[1] if len(cells) > 1 else None
-                            
-                            if ticker_cell and company_cell:
-                                ticker_link = ticker_cell.find('a')
-                                ticker = ticker_link.get_text(strip=True) if ticker_link else ticker_cell.get_text(strip=True)
-                                company = company_cell.get_text(strip=True)
-                                
-                                # Extract time if available
-                                time_str = cells[2].get_text(strip=True) if len(cells) > 2 else 'N/A'
-                                
-                                # Use current date for now
-                                earnings_date = datetime.now().date()
-                                
-                                if ticker and company:
-                                    earnings.append({
-                                        'ticker': ticker,
-                                        'company': company,
-                                        'date': earnings_date,
-                                        'time': time_str,
-                                        'source': 'MarketWatch'
-                                    })
-                        except Exception as e:
-                            logger.warning(f"Error parsing MarketWatch row: {e}")
+            table = self._find_earnings_table(html)
+            if table is not None:
+                for row in table.itertuples(index=False):
+                    try:
+                        cells = self._row_cells(row)
+                        if len(cells) < 3 or self._is_header_row(cells, table):
                             continue
+                        
+                        # Extract ticker, company and time if available
+                        ticker, _ = cells[0]
+                        company, _ = cells[1]
+                        time_str, _ = cells[2]
+                        
+                        # Use current date for now
+                        earnings_date = today
+                        
+                        if ticker and company:
+                            self._add_earning(earnings, ticker, company, earnings_date, time_str, 'MarketWatch')
+                    except Exception as e:
+                        logger.warning(f"Error parsing MarketWatch row: {e}")
+                        continue
             
         except Exception as e:
-            logger.error(f"Error scraping MarketWatch earnings: {e}")
+            logger.error(f"Error parsing MarketWatch earnings: {e}")
         
         return earnings
     
+    def _find_earnings_table(self, html: bytes) -> Optional[pd.DataFrame]:
+        """
+        Parse a page's tables in one lxml pass, keeping cell links, and
+        return the first whose headers include the earnings columns
+        """
+        try:
+            tables = pd.read_html(BytesIO(html), flavor='lxml', extract_links='body')
+        except ValueError:
+            # read_html raises when the page has no tables at all
+            return None
+        
+        for table in tables:
+            if self.EARNINGS_TABLE_HEADERS <= {str(column).strip() for column in table.columns}:
+                return table
+            
+            # A header row built from <td> cells is read as the first body row
+            if not table.empty:
+                first_row = [self._cell_text_and_link(cell)[0] for cell in table.iloc[0]]
+                if self.EARNINGS_TABLE_HEADERS <= set(first_row):
+                    return table.iloc[1:].set_axis(first_row, axis=1)
+        
+        return None
+    
+    def _row_cells(self, row) -> List[Tuple[str, Optional[str]]]:
+        """
+        Split a read_html row into (text, link) cells, dropping the NaN
+        padding read_html adds to rows shorter than the header
+        """
+        return [
+            self._cell_text_and_link(cell)
+            for cell in row
+            if isinstance(cell, tuple) or not pd.isna(cell)
+        ]
+    
+    def _is_header_row(self, cells: List[Tuple[str, Optional[str]]], table: pd.DataFrame) -> bool:
+        """
+        Check whether a row just repeats the table's column headers
+        """
+        headers = [str(column).strip() for column in table.columns]
+        return [text for text, _ in cells] == headers[:len(cells)]
+    
+    def _cell_text_and_link(self, cell) -> Tuple[str, Optional[str]]:
+        """
+        Split a read_html cell into its stripped text and link target
+        """
+        if isinstance(cell, tuple):
+            text, href = cell
+            return (text.strip() if isinstance(text, str) else ''), href
+        if pd.isna(cell):
+            return '', None
+        return str(cell).strip(), None
+    
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """
         Parse date string into datetime object
@@ -304,29 +364,18 @@ class EarningsScraper:
             # Clean the date string
             date_str = date_str.strip()
             
-            # Common date formats
-            formats = [
-                '%Y-%m-%d',
-                '%m/%d/%Y',
-                '%m/%d/%y',
-                '%b %d, %Y',
-                '%B %d, %Y',
-                '%d %b %Y',
-                '%d %B %Y'
-            ]
-            
-            for fmt in formats:
-                try:
-                    return datetime.strptime(date_str, fmt).date()
-                except ValueError:
-                    continue
+            # Let pandas' C parser handle the absolute formats in one call
+            parsed_date = pd.to_datetime(date_str, errors='coerce')
+            if pd.notna(parsed_date):
+                return parsed_date.date()
             
             # Try parsing relative dates
-            if 'today' in date_str.lower():
+            date_lower = date_str.lower()
+            if 'today' in date_lower:
                 return datetime.now().date()
-            elif 'tomorrow' in date_str.lower():
+            elif 'tomorrow' in date_lower:
                 return (datetime.now() + timedelta(days=1)).date()
-            elif 'yesterday' in date_str.lower():
+            elif 'yesterday' in date_lower:
                 return (datetime.now() - timedelta(days=1)).date()
             
         except Exception as e:
@@ -334,28 +383,23 @@ class EarningsScraper:
         
         return None
     
-    def _parse_finviz_date(self, date_str: str) -> Optional[datetime]:
+    def _parse_finviz_date(self, date_str: str, today: Optional[date] = None) -> Optional[datetime]:
         """
         Parse Finviz date format
         """
+        if today is None:
+            today = datetime.now().date()
+        
         try:
             # Finviz uses formats like "Monday, February 5th"
             date_str = date_str.strip()
             
             # Remove ordinal suffixes (st, nd, rd, th)
-            date_str = re.sub(r'(\d+)(st|nd|rd|th)', r'\1', date_str)
-            
-            # Common Finviz date formats
-            formats = [
-                '%A, %B %d',
-                '%B %d',
-                '%m/%d/%Y',
-                '%Y-%m-%d'
-            ]
+            date_str = self._ORDINAL_RE.sub(r'\1', date_str)
             
-            current_year = datetime.now().year
+            current_year = today.year
             
-            for fmt in formats:
+            for fmt in self._FINVIZ_FORMATS:
                 try:
                     parsed_date = datetime.strptime(date_str, fmt)
                     # If no year specified, use current year
@@ -368,7 +412,7 @@ class EarningsScraper:
         except Exception as e:
             logger.warning(f"Error parsing Finviz date '{date_str}': {e}")
         
-        return datetime.now().date()  # Fallback to today
+        return today  # Fallback to today
     
     
     def __del__(self):
@@ -1,56 +1,169 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from newspaper import Article
 import pandas as pd
 from datetime import datetime, timedelta
 import logging
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
 from typing import List, Dict, Optional
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import re
 
 logger = logging.getLogger(__name__)
 
+# Common non-RSS date formats in news
+_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d',
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y',
+    '%b %d, %Y %H:%M:%S',
+    '%B %d, %Y %H:%M:%S',
+    '%b %d, %Y',
+    '%B %d, %Y'
+)
+# Relative dates such as "3 hours ago"
+_REL_RE = re.compile(r'(\d+)\s*(hour|day|minute)', re.I)
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting the request rate to a single host
+    """
+    def __init__(self, capacity: float, refill_rate: float):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """
+        Block until a token is available, then consume it
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+                self.last_refill = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                wait = (1 - self.tokens) / self.refill_rate
+            
+            time.sleep(wait)
+
+class ArticleCache:
+    """
+    Thread-safe LRU cache of parsed articles whose entries expire after ttl seconds
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key) -> Optional[Dict]:
+        """
+        Return the cached value for key, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value: Dict):
+        """
+        Store value under key, evicting the least recently used entry when full
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+# Parsed article content by (URL, with NLP), shared by every scraper so it
+# outlives a single scrape
+_ARTICLE_CACHE = ArticleCache(maxsize=2048, ttl=3600)
+
 class NewsScraper:
+    # Upper bound on concurrent (ticker, source) fetches
+    MAX_WORKERS = 8
+    # Upper bound on concurrent newspaper3k article downloads
+    ARTICLE_WORKERS = 16
+    
+    # Only the news item nodes are built into the soup; the rest of each
+    # page is skipped by the parser
+    _YAHOO_ITEMS = SoupStrainer('div', class_='Ov(h) Pend(14px) Pstart(14px)')
+    # Match article__content as a whole class token, since the strainer sees
+    # the raw class attribute and MarketWatch items can carry extra classes
+    _MARKETWATCH_ITEMS = SoupStrainer('div', class_=re.compile(r'(^|\s)article__content(\s|$)'))
+    _RSS_ITEMS = SoupStrainer('item')
+    
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        # Enough pooled keep-alive connections for the concurrent fetches,
+        # with retries for rate limiting and transient server errors
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # Per-host rate limits (burst capacity, tokens per second)
+        self._buckets = {
+            'finance.yahoo.com': TokenBucket(5, 2),
+            'www.marketwatch.com': TokenBucket(5, 2),
+            'news.google.com': TokenBucket(3, 1)
+        }
+        # Long-lived pool for article downloads, separate from the per-call
+        # pool that fans out the source pages
+        self._pool = ThreadPoolExecutor(max_workers=self.ARTICLE_WORKERS)
+        # Reference time for the current scrape, set per get_news_for_tickers call
+        self._now = datetime.now()
         
-    def get_news_for_tickers(self, tickers: List[str], days_back: int = 7) -> pd.DataFrame:
+    def close(self):
         """
-        Get news articles for specified tickers
+        Release pooled connections and the article download threads
         """
-        all_articles = []
+        self.session.close()
+        self._pool.shutdown(wait=False)
         
-        for ticker in tickers:
-            try:
-                articles = self._get_ticker_news(ticker, days_back)
-                all_articles.extend(articles)
-                time.sleep(1)  # Rate limiting
-            except Exception as e:
-                logger.error(f"Error getting news for {ticker}: {e}")
-                continue
+    def __enter__(self):
+        return self
         
-        if not all_articles:
-            logger.warning("No news articles scraped from any source")
-            return pd.DataFrame()
-        
-        # Convert to DataFrame and remove duplicates
-        df = pd.DataFrame(all_articles)
-        df = df.drop_duplicates(subset=['url'], keep='first')
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
         
-        # Sort by date (newest first)
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.sort_values('date', ascending=False).reset_index(drop=True)
-        
-        return df
-    
-    def _get_ticker_news(self, ticker: str, days_back: int) -> List[Dict]:
+    def get_news_for_tickers(self, tickers: List[str], days_back: int = 7, summarize: bool = True) -> pd.DataFrame:
         """
-        Get news articles for a specific ticker from multiple sources
+        Get news articles for specified tickers
+
+        With summarize=False the costly newspaper3k NLP step is skipped and
+        the summary is just the start of the article text.
         """
-        articles = []
+        all_articles = []
+        self._now = datetime.now()
         
         # Try multiple news sources
         sources = [
@@ -59,15 +172,46 @@ class NewsScraper:
             self._get_google_news
         ]
         
-        for source_func in sources:
-            try:
-                source_articles = source_func(ticker, days_back)
-                articles.extend(source_articles)
-            except Exception as e:
-                logger.warning(f"Error getting news from {source_func.__name__} for {ticker}: {e}")
-                continue
+        # Every (ticker, source) pair is an independent network-bound fetch,
+        # so run them concurrently and collect results in submission order
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as pool:
+            futures = [
+                (ticker, source_func, pool.submit(source_func, ticker, days_back))
+                for ticker in tickers
+                for source_func in sources
+            ]
+            
+            for ticker, source_func, future in futures:
+                try:
+                    all_articles.extend(future.result())
+                except Exception as e:
+                    logger.warning(f"Error getting news from {source_func.__name__} for {ticker}: {e}")
+                    continue
         
-        return articles
+        if not all_articles:
+            logger.warning("No news articles scraped from any source")
+            return pd.DataFrame()
+        
+        # Sort newest first; the sort is stable, so equal dates keep their
+        # submission order. The same story often turns up under several
+        # sources or tickers, so deduplicating afterwards keeps its newest
+        # copy and each URL is downloaded only once
+        all_articles.sort(key=lambda article: article['date'], reverse=True)
+        seen_urls = set()
+        unique_articles = []
+        for article in all_articles:
+            if article['url'] not in seen_urls:
+                seen_urls.add(article['url'])
+                unique_articles.append(article)
+        
+        # Download and parse the full articles concurrently
+        self._add_article_content(unique_articles, want_nlp=summarize)
+        
+        # Dates are already datetime objects, so the column comes out as
+        # datetime64 and the rows are already deduplicated and sorted
+        df = pd.DataFrame(unique_articles)
+        
+        return df
     
     def _get_yahoo_news(self, ticker: str, days_back: int) -> List[Dict]:
         """
@@ -77,8 +221,9 @@ class NewsScraper:
         
         try:
             url = f"https://finance.yahoo.com/quote/{ticker}/news"
+            self._throttle(url)
             response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(response.content, 'lxml', parse_only=self._YAHOO_ITEMS)
             
             # Find news articles
             news_items = soup.find_all('div', {'class': 'Ov(h) Pend(14px) Pstart(14px)'})
@@ -102,17 +247,17 @@ class NewsScraper:
                     date_elem = item.find('span', {'class': 'C(#959595)'})
                     date_str = date_elem.get_text(strip=True) if date_elem else ""
                     
+                    # Skip if article is too old
+                    article_date = self._parse_news_date(date_str, self._now)
+                    if article_date and (self._now - article_date).days > days_back:
+                        continue
+                    
                     if title and article_url:
-                        # Parse the full article for summary
-                        article_data = self._parse_article(article_url)
-                        
                         articles.append({
                             'ticker': ticker,
                             'title': title,
                             'url': article_url,
-                            'date': self._parse_news_date(date_str),
-                            'summary': article_data.get('summary', ''),
-                            'full_text': article_data.get('text', ''),
+                            'date': article_date,
                             'source': 'Yahoo Finance'
                         })
                         
@@ -133,8 +278,9 @@ class NewsScraper:
         
         try:
             url = f"https://www.marketwatch.com/investing/stock/{ticker}/news"
+            self._throttle(url)
             response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(response.content, 'lxml', parse_only=self._MARKETWATCH_ITEMS)
             
             # Find news articles
             news_items = soup.find_all('div', {'class': 'article__content'})
@@ -157,17 +303,17 @@ class NewsScraper:
                     date_elem = item.find('span', {'class': 'article__timestamp'})
                     date_str = date_elem.get_text(strip=True) if date_elem else ""
                     
+                    # Skip if article is too old
+                    article_date = self._parse_news_date(date_str, self._now)
+                    if article_date and (self._now - article_date).days > days_back:
+                        continue
+                    
                     if title and article_url:
-                        # Parse the full article for summary
-                        article_data = self._parse_article(article_url)
-                        
                         articles.append({
                             'ticker': ticker,
                             'title': title,
                             'url': article_url,
-                            'date': self._parse_news_date(date_str),
-                            'summary': article_data.get('summary', ''),
-                            'full_text': article_data.get('text', ''),
+                            'date': article_date,
                             'source': 'MarketWatch'
                         })
                         
@@ -191,8 +337,9 @@ class NewsScraper:
             query = f"{ticker} stock earnings financial news"
             url = f"https://news.google.com/rss/search?q={query}"
             
+            self._throttle(url)
             response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'xml')
+            soup = BeautifulSoup(response.content, 'lxml-xml', parse_only=self._RSS_ITEMS)
             
             # Parse RSS feed
             items = soup.find_all('item')
@@ -204,20 +351,15 @@ class NewsScraper:
                     pub_date = item.find('pubDate').get_text(strip=True)
                     
                     # Skip if article is too old
-                    article_date = self._parse_news_date(pub_date)
-                    if article_date and (datetime.now() - article_date).days > days_back:
+                    article_date = self._parse_news_date(pub_date, self._now)
+                    if article_date and (self._now - article_date).days > days_back:
                         continue
                     
-                    # Parse the full article for summary
-                    article_data = self._parse_article(link)
-                    
                     articles.append({
                         'ticker': ticker,
                         'title': title,
                         'url': link,
                         'date': article_date,
-                        'summary': article_data.get('summary', ''),
-                        'full_text': article_data.get('text', ''),
                         'source': 'Google News'
                     })
                     
@@ -230,22 +372,59 @@ class NewsScraper:
         
         return articles
     
-    def _parse_article(self, url: str) -> Dict[str, str]:
+    def _throttle(self, url: str):
+        """
+        Wait for the rate limit of the URL's host, if it has one
+        """
+        bucket = self._buckets.get(urlparse(url).netloc)
+        if bucket:
+            bucket.acquire()
+    
+    def _add_article_content(self, articles: List[Dict], want_nlp: bool = False):
+        """
+        Fill in summary and full text for each article using the parse pool
+        """
+        parse = partial(self._parse_article, want_nlp=want_nlp)
+        contents = self._pool.map(parse, [article['url'] for article in articles])
+        for article, article_data in zip(articles, contents):
+            article['summary'] = article_data.get('summary', '')
+            article['full_text'] = article_data.get('text', '')
+    
+    def _parse_article(self, url: str, want_nlp: bool = False) -> Dict[str, str]:
         """
-        Parse article content using newspaper3k
+        Parse article content using newspaper3k, running NLP only on request
         """
+        cache_key = (url, want_nlp)
+        cached = _ARTICLE_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
+            # Fetch through the pooled, retrying session rather than
+            # newspaper's own downloader, then hand it the HTML
+            self._throttle(url)
+            response = self.session.get(url, timeout=10)
+            response.raise_for_status()
+            
             article = Article(url)
-            article.download()
+            article.set_html(response.content)
             article.parse()
-            article.nlp()
             
-            return {
+            if want_nlp:
+                article.nlp()
+                summary = article.summary
+            else:
+                summary = article.text[:280]
+            
+            article_data = {
                 'text': article.text,
-                'summary': article.summary,
+                'summary': summary,
                 'authors': article.authors,
                 'publish_date': article.publish_date
             }
+            # Failures are not cached so they can be retried on the next call
+            _ARTICLE_CACHE.set(cache_key, article_data)
+            return article_data
             
         except Exception as e:
             logger.warning(f"Error parsing article {url}: {e}")
@@ -256,50 +435,44 @@ class NewsScraper:
                 'publish_date': None
             }
     
-    def _parse_news_date(self, date_str: str) -> Optional[datetime]:
+    def _parse_news_date(self, date_str: str, now: Optional[datetime] = None) -> Optional[datetime]:
         """
-        Parse news date string into datetime object
+        Parse news date string into datetime object, relative to now
         """
+        if now is None:
+            now = datetime.now()
+        
         if not date_str:
-            return datetime.now()
+            return now
         
         try:
             # Clean the date string
             date_str = date_str.strip()
             
-            # Common date formats in news
-            formats = [
-                '%Y-%m-%d %H:%M:%S',
-                '%Y-%m-%d',
-                '%m/%d/%Y %H:%M:%S',
-                '%m/%d/%Y',
-                '%b %d, %Y %H:%M:%S',
-                '%B %d, %Y %H:%M:%S',
-                '%b %d, %Y',
-                '%B %d, %Y',
-                '%a, %d %b %Y %H:%M:%S %Z',  # RSS format
-                '%a, %d %b %Y %H:%M:%S %z'   # RSS format with timezone
-            ]
+            # RSS feeds use RFC 2822 dates, which email.utils parses in one go
+            try:
+                parsed_date = parsedate_to_datetime(date_str)
+                if parsed_date.tzinfo is not None:
+                    # Compare against the naive local now used elsewhere
+                    parsed_date = parsed_date.astimezone().replace(tzinfo=None)
+                return parsed_date
+            except (TypeError, ValueError, IndexError):
+                pass
             
-            for fmt in formats:
+            for fmt in _FORMATS:
                 try:
                     return datetime.strptime(date_str, fmt)
                 except ValueError:
                     continue
             
             # Try parsing relative dates
-            if 'hour' in date_str.lower():
-                hours = int(re.search(r'(\d+)', date_str).group(1))
-                return datetime.now() - timedelta(hours=hours)
-            elif 'day' in date_str.lower():
-                days = int(re.search(r'(\d+)', date_str).group(1))
-                return datetime.now() - timedelta(days=days)
-            elif 'minute' in date_str.lower():
-                minutes = int(re.search(r'(\d+)', date_str).group(1))
-                return datetime.now() - timedelta(minutes=minutes)
+            match = _REL_RE.search(date_str)
+            if match:
+                amount, unit = int(match.group(1)), match.group(2).lower()
+                return now - timedelta(**{unit + 's': amount})
             
         except Exception as e:
             logger.warning(f"Error parsing news date '{date_str}': {e}")
         
-        return datetime.now()
+        return now
     
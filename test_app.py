@@ -4,6 +4,7 @@ Test script for EarningsRadar application
 """
 
 import sys
+import importlib.util
 import pandas as pd
 from datetime import datetime
 import logging
@@ -44,11 +45,10 @@ def test_news_scraper():
     try:
         from news_scraper import NewsScraper
         
-        scraper = NewsScraper()
-        
         # Test actual news scraping
         test_tickers = ['AAPL', 'MSFT']
-        news_df = scraper.get_news_for_tickers(test_tickers)
+        with NewsScraper() as scraper:
+            news_df = scraper.get_news_for_tickers(test_tickers, summarize=False)
         print(f"✓ News articles: {len(news_df)} entries")
         
         if not news_df.empty:
@@ -69,8 +69,9 @@ def test_utils():
     
     try:
         from utils import (
-            format_date, clean_ticker, validate_ticker, 
-            get_earnings_time_category, export_to_csv
+            format_date, format_date_series, clean_ticker, validate_ticker, validate_tickers,
+            get_earnings_time_category, export_to_csv, export_to_csv_bytes,
+            clean_ticker_series, validate_ticker_series, get_quarter_series
         )
         
         # Test date formatting
@@ -79,12 +80,27 @@ def test_utils():
         print(f"✓ Date formatting: {formatted}")
         
         # Test ticker cleaning
-        test_tickers = ['AAPL.US', 'msft-usd', 'GOOGL']
-        for ticker in test_tickers:
-            cleaned = clean_ticker(ticker)
-            valid = validate_ticker(cleaned)
+        test_tickers = ['AAPL.US', 'msft-usd', 'GOOGL', 'ABC.L.TO']
+        for ticker, (cleaned, valid) in zip(test_tickers, validate_tickers(test_tickers)):
             print(f"✓ Ticker '{ticker}' -> '{cleaned}' (valid: {valid})")
         
+        # Test vectorized ticker cleaning matches the scalar version
+        ticker_series = pd.Series(test_tickers)
+        cleaned_series = clean_ticker_series(ticker_series)
+        assert cleaned_series.tolist() == [clean_ticker(t) for t in test_tickers]
+        assert validate_ticker_series(ticker_series).tolist() == [validate_ticker(t) for t in test_tickers]
+        print(f"✓ Vectorized tickers: {cleaned_series.tolist()}")
+        
+        # Test vectorized date formatting matches the scalar version
+        date_series = pd.Series([datetime(2024, 2, 15), 'Feb 15, 2024', 'junk', 5, None])
+        assert format_date_series(date_series).tolist() == [format_date(d) for d in date_series]
+        print(f"✓ Vectorized dates: {format_date_series(date_series).tolist()}")
+        
+        # Test vectorized quarter labels
+        quarters = get_quarter_series(pd.Series(['2024-02-15', '2024-11-01', None]))
+        assert quarters.tolist() == ['Q1 2024', 'Q4 2024', '']
+        print(f"✓ Vectorized quarters: {quarters.tolist()}")
+        
         # Test time categorization
         test_times = ['Pre-market', 'After-hours', 'During market', 'Unknown']
         for time_str in test_times:
@@ -94,6 +110,7 @@ def test_utils():
         # Test CSV export
         test_df = pd.DataFrame({'A': [1, 2], 'B': [3, 4]})
         csv_data = export_to_csv(test_df)
+        assert export_to_csv_bytes(test_df) == csv_data.encode('utf-8')
         print(f"✓ CSV export: {len(csv_data)} characters")
         
         return True
@@ -110,7 +127,9 @@ def test_dependencies():
         'streamlit',
         'pandas',
         'requests',
+        'requests_cache',
         'bs4',
+        'lxml',
         'newspaper',
         'plotly'
     ]
@@ -118,10 +137,10 @@ def test_dependencies():
     missing_modules = []
     
     for module in required_modules:
-        try:
-            __import__(module)
+        # find_spec resolves the module without importing it
+        if importlib.util.find_spec(module) is not None:
             print(f"✓ {module}")
-        except ImportError:
+        else:
             print(f"✗ {module} - NOT FOUND")
             missing_modules.append(module)
     
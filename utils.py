@@ -1,9 +1,17 @@
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import logging
-import os
-from io import StringIO
 import csv
+from io import BytesIO
+from pathlib import Path
+
+# Common exchange suffixes, each stripped at most once and in this order
+_TICKER_SUFFIXES = ('-USD', '-US', '.US', '.TO', '.L')
+
+# Backup directory, created on the first backup of the process
+_BACKUP_DIR = Path('backups')
+_BACKUP_DIR_READY = False
 
 def setup_logging():
     """
@@ -33,13 +41,39 @@ def format_date(date_obj):
     except:
         return str(date_obj)
 
+def format_date_series(dates: pd.Series) -> pd.Series:
+    """
+    Format a Series of dates for display in one vectorized pass
+    """
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return dates.dt.strftime('%Y-%m-%d').fillna('')
+    
+    # Like format_date, missing values become empty, strings are shown as
+    # given and anything without strftime falls back to str()
+    formatted = dates.astype(object).where(dates.notna(), '')
+    
+    # Only mixed object columns can hold dates; string columns never do
+    if pd.api.types.is_object_dtype(dates) and not pd.api.types.is_string_dtype(dates):
+        date_like = dates.notna() & dates.map(lambda value: hasattr(value, 'strftime'))
+        if date_like.any():
+            formatted[date_like] = pd.to_datetime(dates[date_like]).dt.strftime('%Y-%m-%d')
+    
+    return formatted.map(str)
+
 def export_to_csv(df: pd.DataFrame) -> str:
     """
     Export DataFrame to CSV string
     """
-    output = StringIO()
-    df.to_csv(output, index=False)
-    return output.getvalue()
+    return df.to_csv(index=False)
+
+def export_to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """
+    Export DataFrame to UTF-8 CSV bytes, encoding rows as they are written
+    rather than building the whole CSV string first
+    """
+    buffer = BytesIO()
+    df.to_csv(buffer, index=False, encoding='utf-8')
+    return buffer.getvalue()
 
 def create_ical_event(ticker: str, company: str, date: datetime, time: str) -> str:
     """
@@ -81,26 +115,42 @@ X-WR-TIMEZONE:America/New_York
     
     calendar_footer = "END:VCALENDAR"
     
-    events = []
-    for _, row in earnings_df.iterrows():
-        event = create_ical_event(
-            row['ticker'], 
-            row['company'], 
-            row['date'], 
-            row['time']
-        )
-        events.append(event)
+    if earnings_df.empty:
+        return calendar_header + calendar_footer
+    
+    # Build every event at once; same times as create_ical_event
+    days = pd.to_datetime(earnings_df['date']).dt.strftime('%Y%m%d')
+    time_lower = earnings_df['time'].fillna('').astype(str).str.lower()
+    conditions = [
+        time_lower.str.contains('pre', regex=False),    # 9 AM ET = 1 PM UTC
+        time_lower.str.contains('after', regex=False)   # 5 PM ET = 9 PM UTC
+    ]
+    start_times = np.select(conditions, ['T130000Z', 'T210000Z'], default='T090000Z')
+    end_times = np.select(conditions, ['T140000Z', 'T220000Z'], default='T100000Z')
+    
+    tickers = earnings_df['ticker'].astype(str)
+    companies = earnings_df['company'].astype(str)
+    events = (
+        "BEGIN:VEVENT\nDTSTART:" + days + start_times
+        + "\nDTEND:" + days + end_times
+        + "\nSUMMARY:" + tickers + " Earnings Call"
+        + "\nDESCRIPTION:Earnings call for " + companies + " (" + tickers + ")"
+        + "\nLOCATION:Conference Call\nEND:VEVENT\n"
+    ).tolist()
     
     return calendar_header + "\n".join(events) + calendar_footer
 
-def filter_recent_dates(df: pd.DataFrame, days: int = 30) -> pd.DataFrame:
+def filter_recent_dates(df: pd.DataFrame, days: int = 30, now: datetime = None) -> pd.DataFrame:
     """
     Filter DataFrame to include only recent dates
     """
     if df.empty:
         return df
     
-    cutoff_date = datetime.now() - timedelta(days=days)
+    if now is None:
+        now = datetime.now()
+    
+    cutoff_date = now - timedelta(days=days)
     return df[df['date'] >= cutoff_date]
 
 def get_market_hours(date_obj: datetime) -> dict:
@@ -122,19 +172,24 @@ def clean_ticker(ticker: str) -> str:
     if not ticker:
         return ""
     
-    # Remove common suffixes and clean
     ticker = ticker.upper().strip()
     
     # Remove common exchange suffixes
-    suffixes = ['-USD', '-US', '.US', '.TO', '.L']
-    for suffix in suffixes:
+    for suffix in _TICKER_SUFFIXES:
         if ticker.endswith(suffix):
             ticker = ticker[:-len(suffix)]
     
     # Remove dots (but after suffix removal)
-    ticker = ticker.replace('.', '')
-    
-    return ticker
+    return ticker.replace('.', '')
+
+def clean_ticker_series(tickers: pd.Series) -> pd.Series:
+    """
+    Clean and standardize a Series of ticker symbols in one vectorized pass
+    """
+    cleaned = tickers.fillna('').astype(str).str.upper().str.strip()
+    for suffix in _TICKER_SUFFIXES:
+        cleaned = cleaned.str.removesuffix(suffix)
+    return cleaned.str.replace('.', '', regex=False)
 
 def validate_ticker(ticker: str) -> bool:
     """
@@ -143,8 +198,12 @@ def validate_ticker(ticker: str) -> bool:
     if not ticker:
         return False
     
-    ticker = clean_ticker(ticker)
-    
+    return _validate_clean(clean_ticker(ticker))
+
+def _validate_clean(ticker: str) -> bool:
+    """
+    Validate a ticker symbol that has already been cleaned
+    """
     # Basic checks
     if len(ticker) < 1 or len(ticker) > 5:
         return False
@@ -154,6 +213,26 @@ def validate_ticker(ticker: str) -> bool:
     
     return True
 
+def validate_tickers(tickers) -> list:
+    """
+    Clean and validate ticker symbols, returning (cleaned, valid) pairs
+    """
+    results = []
+    for ticker in tickers:
+        if not ticker:
+            results.append(('', False))
+            continue
+        cleaned = clean_ticker(ticker)
+        results.append((cleaned, _validate_clean(cleaned)))
+    return results
+
+def validate_ticker_series(tickers: pd.Series) -> pd.Series:
+    """
+    Basic validation for a Series of ticker symbols
+    """
+    cleaned = clean_ticker_series(tickers)
+    return cleaned.str.len().between(1, 5) & cleaned.str.isalpha()
+
 def get_earnings_time_category(time_str: str) -> str:
     """
     Categorize earnings time into pre-market, market hours, or after-hours
@@ -184,7 +263,7 @@ def format_currency(amount: float, currency: str = 'USD') -> str:
     else:
         return f"{amount:,.2f} {currency}"
 
-def calculate_days_until(target_date) -> int:
+def calculate_days_until(target_date, today=None) -> int:
     """
     Calculate days until target date
     """
@@ -195,7 +274,8 @@ def calculate_days_until(target_date) -> int:
         if isinstance(target_date, str):
             target_date = pd.to_datetime(target_date)
         
-        today = datetime.now().date()
+        if today is None:
+            today = datetime.now().date()
         if hasattr(target_date, 'date'):
             target_date = target_date.date()
         
@@ -228,20 +308,32 @@ def get_quarter_from_date(date_obj) -> str:
     except:
         return ""
 
+def get_quarter_series(dates: pd.Series) -> pd.Series:
+    """
+    Get quarter labels (e.g. "Q1 2024") for a Series of dates
+    """
+    dates = pd.to_datetime(dates, errors='coerce')
+    quarters = (
+        'Q' + dates.dt.quarter.astype('Int64').astype(str)
+        + ' ' + dates.dt.year.astype('Int64').astype(str)
+    )
+    return quarters.where(dates.notna(), '')
+
 def create_backup_file(df: pd.DataFrame, filename: str):
     """
     Create backup file of earnings data
     """
+    global _BACKUP_DIR_READY
     try:
-        backup_dir = "backups"
-        if not os.path.exists(backup_dir):
-            os.makedirs(backup_dir)
+        if not _BACKUP_DIR_READY:
+            _BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+            _BACKUP_DIR_READY = True
         
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_path = os.path.join(backup_dir, f"{filename}_{timestamp}.csv")
+        backup_path = _BACKUP_DIR / f"{filename}_{timestamp}.csv"
         
         df.to_csv(backup_path, index=False)
-        return backup_path
+        return str(backup_path)
     except Exception as e:
         logging.error(f"Error creating backup: {e}")
         return None